@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 from src.data_loader import load_and_clean_data
 from src.data_loader import process_user_dataframe
+from src.data_loader import load_quarter_from_cube
+from src.data_loader import load_validation_report
 from src.calculations import calculate_kpis, get_market_averages, MAPPING
 from src.ai_engine import get_gemini_analysis
 from src.charts import plot_profit_comparison, plot_income_pie, plot_expense_pie
@@ -66,8 +68,14 @@ with st.sidebar:
 
 # 1. UČITAVANJE I OBRADA
 # Automatsko učitavanje podataka iz data/bu foldera za izabrani kvartal
+# Ako je izgrađena memorijski mapirana kocka (python -m src.cube), čitamo iz nje
 with st.spinner(f"Učitavam podatke za {selected_quarter_label}..."):
-    raw_df = load_and_clean_data(data_folder="data", quarter_pattern=quarter_pattern)
+    cube_df = load_quarter_from_cube(quarter_pattern=quarter_pattern)
+    if cube_df is not None and not cube_df.empty:
+        raw_df = cube_df
+    else:
+        cube_df = None
+        raw_df = load_and_clean_data(data_folder="data", quarter_pattern=quarter_pattern)
 
 # Inicijalizacija varijabli
 df_kpi = None
@@ -75,8 +83,8 @@ market_avg = None
 selected_bank = None
 
 if raw_df is not None and not raw_df.empty:
-    # Pivotiranje
-    df_ready = process_user_dataframe(raw_df)
+    # Pivotiranje (kocka je već pivotirana)
+    df_ready = cube_df if cube_df is not None else process_user_dataframe(raw_df)
     
     if df_ready is not None:
         # Kalkulacije KPI
@@ -103,6 +111,24 @@ if df_kpi is not None and selected_bank:
         # Prikaz ključnih metrika za pojedinačnu banku
         st.subheader(f"📊 {selected_bank}")
         st.caption("💡 Napomena: Svi iznosi su u hiljadama €")
+
+        # Upozorenje ako podaci banke za ovaj kvartal ne prolaze validaciju
+        report = load_validation_report()
+        bank_issues = report[
+            (report['BANKA'] == selected_bank) &
+            (report['KVARTAL'] == quarter_pattern) &
+            (report['IZVJESTAJ'].isin(['bu', 'bs']))
+        ]
+        if not bank_issues.empty:
+            statement_labels = {'bu': 'Bilans uspjeha', 'bs': 'Bilans stanja'}
+            issues = [
+                f"{statement_labels[statement]}: " + ", ".join(rows['PROVJERA'].unique())
+                for statement, rows in bank_issues.groupby('IZVJESTAJ', sort=False)
+            ]
+            st.warning(
+                "⚠️ Podaci ne prolaze validaciju — " + "; ".join(issues) +
+                ". KPI mogu biti netačni."
+            )
         col1, col2, col3, col4 = st.columns(4)
         
         nd_delta = bank_row['Neto_Dobit_Final'] - market_avg['Neto_Dobit_Final']
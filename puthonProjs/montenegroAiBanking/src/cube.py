@@ -0,0 +1,404 @@
+"""
+Memorijski mapirana NumPy kocka sa iznosima: izvještaj × banka × kvartal × pozicija.
+
+Kocka se jednom izgradi iz CSV fajlova (data/bu i data/bs) i snimi u
+verzionisani podfolder `data/cube/<verzija>/` kao `values.npy` + mali JSON
+indeksi za svaku osu. Pozicije su kanonske (src.layouts): ista stavka iz
+različitih formata izvještaja je jedna kolona kroz sve kvartale. Fajl `data/cube/CURRENT` pokazuje na aktuelnu verziju.
+Sve Streamlit sesije i radni procesi zatim otvaraju isti fajl samo za
+čitanje (mmap), pa se stranice memorije dijele, a isječci su bez kopiranja.
+
+Izgradnja iz komandne linije:
+    python -m src.cube
+"""
+
+import csv
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from src.bank_names import get_bank_name
+from src.layouts import LAYOUT_NAMES, canonical_key, detect_layout, position_code
+from src.validation import REPORT_FILE, validate_cube, write_report
+
+# Redoslijed izvještaja u kocki: bilans uspjeha i bilans stanja
+STATEMENTS = ['bu', 'bs']
+
+VALUES_FILE = 'values.npy'
+CURRENT_FILE = 'CURRENT'
+# Folder iz kog potiče svaki kod banke (poravnato sa banks.json). Jedan folder
+# je jedna institucija, a kod se mijenja kad banka promijeni ime (pdg -> sgm).
+INSTITUTIONS_FILE = 'institutions.json'
+# Format izvještaja za svaku ćeliju (izvještaj, banka, kvartal): indeks u
+# LAYOUTS_FILE ili -1 ako format nije prepoznat
+CELL_LAYOUTS_FILE = 'layouts.npy'
+# {format: {oznaka pozicije u tom formatu: indeks kanonske pozicije}}
+LAYOUTS_FILE = 'layouts.json'
+# Fajlovi koji nisu mogli biti pročitani (po jedan zapis za svaki fajl)
+UNREADABLE_FILE = 'unreadable.json'
+AXIS_FILES = {
+    'statements': 'statements.json',
+    'banks': 'banks.json',
+    'quarters': 'quarters.json',
+    'positions': 'positions.json',
+}
+
+
+def quarter_sort_key(quarter: str):
+    """
+    Ključ za hronološko sortiranje kvartala u formatu MMYY.
+
+    Args:
+        quarter: Kvartal (npr. "0925" za III kvartal 2025)
+
+    Returns:
+        Tuple (godina, mjesec)
+    """
+    return int(quarter[2:]), int(quarter[:2])
+
+
+def resolve_cube_dir(cube_dir: str = "data/cube"):
+    """
+    Vraća folder aktuelne verzije kocke (na koju pokazuje CURRENT).
+
+    Args:
+        cube_dir: Folder sa kockom (default: "data/cube")
+
+    Returns:
+        Putanja do verzije ili None ako kocka nije izgrađena
+    """
+    pointer = Path(cube_dir) / CURRENT_FILE
+    if not pointer.exists():
+        return None
+    version_dir = Path(cube_dir) / pointer.read_text(encoding='utf-8').strip()
+    if not (version_dir / VALUES_FILE).exists():
+        return None
+    return version_dir
+
+
+def _parse_amount(value: str) -> float:
+    """
+    Pretvara tekstualni iznos ("1,234", "-589") u float.
+    Za razliku od clean_currency_string, prazna ćelija ostaje NaN (kocka
+    razlikuje nepopunjenu poziciju od nule), a ćelija koja poslije uklanjanja
+    separatora hiljada i znaka nije čist broj (slova, zagrade, "(cid:N)"
+    iz oštećenih PDF izvoza) je takođe NaN umjesto izmišljenog iznosa.
+    """
+    clean_val = value.strip().replace(',', '').replace(' ', '')
+    if not re.fullmatch(r'-?\d+', clean_val):
+        return np.nan
+    return float(clean_val)
+
+
+def _parse_file_name(csv_file: Path):
+    """
+    Iz imena fajla (npr. "0925ckb_bu.csv") vraća (kvartal, kod_banke, izvještaj).
+    Vraća None ako ime nije u očekivanom formatu.
+    """
+    match = re.match(r'^(\d{4})([a-zA-Z]{3})[a-zA-Z]*_(bu|bs)$', csv_file.stem)
+    if not match:
+        return None
+    return match.group(1), match.group(2).lower(), match.group(3)
+
+
+def _read_positions(csv_file: Path) -> dict:
+    """
+    Čita jedan CSV i vraća {naziv_pozicije: iznos} sa nazivima kao u fajlu.
+
+    Formati se razlikuju po godinama (kolone "POZICIJA", "R. br.", "Aktiva"...),
+    pa se posljednja kolona uzima kao iznos, a sve ostale popunjene ćelije
+    se spajaju u naziv pozicije. Redovi zaglavlja (sa "IZNOS") se preskaču.
+    Eventualne duple pozicije se sabiraju, kao u process_user_dataframe.
+
+    Vraća None ako prvi red nije prepoznato zaglavlje (kolona "IZNOS"), npr.
+    kod oštećenih PDF izvoza gdje je svaki znak snimljen kao "(cid:N)".
+    """
+    positions = {}
+    section = ''
+    with open(csv_file, encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if not any(cell.strip().upper() == 'IZNOS' for cell in header):
+            return None
+        for row in reader:
+            if len(row) < 2:
+                continue
+            if any(cell.strip().upper() == 'IZNOS' for cell in row):
+                continue
+            # Podstavke bez oznake ("1) Depoziti") nasljeđuju oznaku nadređene
+            # pozicije ("PR 1."), da se ne bi miješale istoimene podstavke
+            cells = [cell.strip() for cell in row[:-1]]
+            if len(cells) > 1:
+                if cells[0]:
+                    section = cells[0]
+                elif section:
+                    cells[0] = section
+            label = ' '.join(cell for cell in cells if cell)
+            label = re.sub(r'\s+', ' ', label)
+            if not label or label.upper() == 'POZICIJA':
+                continue
+            amount = _parse_amount(row[-1])
+            if label in positions and not np.isnan(positions[label]):
+                if not np.isnan(amount):
+                    positions[label] += amount
+            else:
+                positions[label] = amount
+    return positions
+
+
+def build_cube(data_folder: str = "data", cube_dir: str = "data/cube") -> Path:
+    """
+    Gradi kocku iz svih *_bu.csv i *_bs.csv fajlova i snima je na disk.
+
+    Nepostojeće ili prazne ćelije su NaN. Fajlovi koji ne mogu da se pročitaju
+    (oštećen izvoz) se preskaču i bilježe jednom u unreadable.json. Cijela kocka (niz, indeksi osa i
+    validation.csv iz src.validation) se upisuje u novi verzionisani podfolder,
+    pa se tek onda atomski zamjenjuje pokazivač CURRENT. Procesi koji otvore
+    kocku tokom izgradnje uvijek vide kompletnu staru ili kompletnu novu
+    verziju. Čuvaju se samo nova i prethodna verzija.
+
+    Args:
+        data_folder: Folder sa podfolderima bu/ i bs/ (default: "data")
+        cube_dir: Izlazni folder za kocku (default: "data/cube")
+
+    Returns:
+        Putanja do foldera nove verzije kocke
+    """
+    records = []
+    institutions = {}
+    unreadable = []
+    for statement in STATEMENTS:
+        for csv_file in sorted(Path(data_folder, statement).rglob(f"*_{statement}.csv")):
+            parsed = _parse_file_name(csv_file)
+            if parsed is None:
+                print(f"Fajl {csv_file.name} nema očekivano ime. Preskačem.")
+                continue
+            quarter, bank_code, _ = parsed
+            folder = csv_file.parent.name if csv_file.parent != Path(data_folder, statement) else bank_code
+            if institutions.setdefault(bank_code, folder) != folder:
+                print(f"Kod {bank_code} postoji u folderima {institutions[bank_code]} i {folder}. "
+                      f"Koristim {institutions[bank_code]}.")
+            try:
+                file_values = _read_positions(csv_file)
+                if file_values is None:
+                    print(f"Fajl {csv_file.name} nema prepoznato zaglavlje (oštećen izvoz?). Preskačem.")
+            except Exception as e:
+                print(f"Greška pri učitavanju fajla {csv_file.name}: {e}")
+                file_values = None
+            if file_values is None:
+                unreadable.append({
+                    'IZVJESTAJ': statement,
+                    'KOD': bank_code,
+                    'INSTITUCIJA': institutions[bank_code],
+                    'KVARTAL': quarter,
+                    'FAJL': csv_file.name,
+                })
+                continue
+            layout = detect_layout(statement, file_values)
+            # Svaki naziv iz fajla -> ključ kanonske pozicije (format, oznaka).
+            # Bez prepoznatog formata ili oznake ključ je sam naziv.
+            keys = {}
+            for label in file_values:
+                code = position_code(label)
+                keys[label] = canonical_key(layout, code) if layout and code else (None, label)
+            records.append((statement, bank_code, quarter, layout, keys, file_values))
+
+    banks = sorted({record[1] for record in records})
+    quarters = sorted({record[2] for record in records}, key=quarter_sort_key)
+
+    # Kanonska pozicija dobija naziv iz najnovijeg fajla u kom se pojavljuje,
+    # a redoslijed pozicija prati najnovije izvještaje
+    records.sort(key=lambda record: quarter_sort_key(record[2]), reverse=True)
+    key_labels = {}
+    for _, _, _, _, keys, _ in reversed(records):
+        for label, key in keys.items():
+            key_labels[key] = label
+    positions = list(dict.fromkeys(
+        key_labels[key] for _, _, _, _, keys, _ in records for key in keys.values()
+    ))
+
+    statement_idx = {s: i for i, s in enumerate(STATEMENTS)}
+    bank_idx = {b: i for i, b in enumerate(banks)}
+    quarter_idx = {q: i for i, q in enumerate(quarters)}
+    position_idx = {p: i for i, p in enumerate(positions)}
+    layout_idx = {name: i for i, name in enumerate(LAYOUT_NAMES)}
+
+    # Mapa (format, oznaka) -> kanonska pozicija, za validaciju po formatu
+    position_map = {name: {} for name in LAYOUT_NAMES}
+    for _, _, _, layout, keys, _ in records:
+        if layout is None:
+            continue
+        for label, key in keys.items():
+            code = position_code(label)
+            if code is not None:
+                position_map[layout][code] = position_idx[key_labels[key]]
+
+    root = Path(cube_dir)
+    previous = resolve_cube_dir(cube_dir)
+    out = root / f"v{time.time_ns()}"
+    out.mkdir(parents=True)
+
+    shape = (len(STATEMENTS), len(banks), len(quarters), len(positions))
+    values = np.lib.format.open_memmap(out / VALUES_FILE, mode='w+', dtype=np.float64, shape=shape)
+    values[:] = np.nan
+    cell_layouts = np.lib.format.open_memmap(out / CELL_LAYOUTS_FILE, mode='w+', dtype=np.int8, shape=shape[:3])
+    cell_layouts[:] = -1
+
+    for statement, bank_code, quarter, layout, keys, file_values in records:
+        cell = (statement_idx[statement], bank_idx[bank_code], quarter_idx[quarter])
+        row = {}
+        for label, amount in file_values.items():
+            col = position_idx[key_labels[keys[label]]]
+            if col in row and not np.isnan(row[col]):
+                if not np.isnan(amount):
+                    row[col] += amount
+            else:
+                row[col] = amount
+        values[cell + (list(row),)] = list(row.values())
+        if layout is not None:
+            cell_layouts[cell] = layout_idx[layout]
+
+    values.flush()
+    cell_layouts.flush()
+    del values, cell_layouts
+
+    axes = {
+        'statements': STATEMENTS,
+        'banks': banks,
+        'quarters': quarters,
+        'positions': positions,
+    }
+    for axis, file_name in AXIS_FILES.items():
+        with open(out / file_name, 'w', encoding='utf-8') as f:
+            json.dump(axes[axis], f, ensure_ascii=False, indent=1)
+    with open(out / INSTITUTIONS_FILE, 'w', encoding='utf-8') as f:
+        json.dump([institutions[b] for b in banks], f, ensure_ascii=False, indent=1)
+    with open(out / LAYOUTS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(position_map, f, ensure_ascii=False, indent=1)
+    with open(out / UNREADABLE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(unreadable, f, ensure_ascii=False, indent=1)
+
+    # Validacija pri učitavanju: izvještaj sa ćelijama koje ne prolaze provjeru
+    write_report(validate_cube(BankCube(out)), out)
+
+    # Atomska zamjena pokazivača na novu verziju
+    pointer_tmp = root / (CURRENT_FILE + '.tmp')
+    pointer_tmp.write_text(out.name, encoding='utf-8')
+    os.replace(pointer_tmp, root / CURRENT_FILE)
+
+    # Starije verzije se brišu; prethodna ostaje za procese koji je upravo otvaraju
+    for old in root.glob('v*'):
+        if old.is_dir() and old not in (out, previous):
+            shutil.rmtree(old, ignore_errors=True)
+    return out
+
+
+class BankCube:
+    """
+    Kocka otvorena samo za čitanje.
+
+    Atributi:
+        path: Folder verzije kocke koja je otvorena
+        values: np.memmap oblika (izvještaj, banka, kvartal, pozicija)
+        statements, banks, quarters, positions: liste labela za svaku osu
+        institutions: folder (institucija) za svaki kod iz banks
+        layouts: nazivi formata izvještaja (src.layouts)
+        cell_layouts: np.memmap oblika (izvještaj, banka, kvartal) sa indeksom
+            formata iz layouts, -1 ako format nije prepoznat
+        position_map: {format: {oznaka pozicije: indeks kanonske pozicije}}
+        unreadable: fajlovi preskočeni pri izgradnji, kao rječnici sa ključevima
+            IZVJESTAJ, KOD, INSTITUCIJA, KVARTAL i FAJL
+    """
+
+    def __init__(self, cube_dir: str = "data/cube"):
+        # Prihvata i korijenski folder (sa CURRENT) i folder jedne verzije
+        cube_path = resolve_cube_dir(cube_dir) or Path(cube_dir)
+        self.path = cube_path
+        self.values = np.load(cube_path / VALUES_FILE, mmap_mode='r')
+        for axis, file_name in AXIS_FILES.items():
+            with open(cube_path / file_name, encoding='utf-8') as f:
+                setattr(self, axis, json.load(f))
+
+        for dim, axis in enumerate(AXIS_FILES):
+            if len(getattr(self, axis)) != self.values.shape[dim]:
+                raise ValueError(
+                    f"Kocka u {cube_path} nije konzistentna: osa '{axis}' ima "
+                    f"{len(getattr(self, axis))} labela, a niz {self.values.shape[dim]}"
+                )
+        with open(cube_path / INSTITUTIONS_FILE, encoding='utf-8') as f:
+            self.institutions = json.load(f)
+        if len(self.institutions) != len(self.banks):
+            raise ValueError(f"Kocka u {cube_path} nije konzistentna: {INSTITUTIONS_FILE} ne odgovara osi 'banks'")
+        self.cell_layouts = np.load(cube_path / CELL_LAYOUTS_FILE, mmap_mode='r')
+        if self.cell_layouts.shape != self.values.shape[:3]:
+            raise ValueError(f"Kocka u {cube_path} nije konzistentna: {CELL_LAYOUTS_FILE} ne odgovara nizu")
+        with open(cube_path / LAYOUTS_FILE, encoding='utf-8') as f:
+            self.position_map = json.load(f)
+        self.layouts = list(self.position_map)
+        with open(cube_path / UNREADABLE_FILE, encoding='utf-8') as f:
+            self.unreadable = json.load(f)
+
+        self._statement_idx = {s: i for i, s in enumerate(self.statements)}
+        self._bank_idx = {b: i for i, b in enumerate(self.banks)}
+        self._quarter_idx = {q: i for i, q in enumerate(self.quarters)}
+        self._position_idx = {p: i for i, p in enumerate(self.positions)}
+
+    def quarter_slice(self, quarter: str, statement: str = 'bu') -> np.ndarray:
+        """
+        Vraća pogled (bez kopiranja) oblika (banka, pozicija) za jedan kvartal.
+        """
+        return self.values[self._statement_idx[statement], :, self._quarter_idx[quarter], :]
+
+    def position_series(self, position: str, statement: str = 'bu') -> np.ndarray:
+        """
+        Vraća pogled (bez kopiranja) oblika (banka, kvartal) za jednu poziciju.
+
+        Pozicija je kanonska (naziv iz najnovijeg formata, npr. "22. NETO
+        PROFIT/GUBITAK (III - 21)"), pa serija obuhvata i kvartale iz starijih
+        formata u kojima ista stavka ima drugu oznaku ili naziv.
+        """
+        return self.values[self._statement_idx[statement], :, :, self._position_idx[position]]
+
+    def to_frame(self, quarter: str, statement: str = 'bu'):
+        """
+        Vraća DataFrame u istom obliku kao process_user_dataframe:
+        kolona 'BANKA' (puni naziv) + po jedna kolona za svaku poziciju.
+        Izostavljaju se banke i pozicije bez podataka za taj kvartal.
+
+        Args:
+            quarter: Kvartal u formatu MMYY (npr. "0925")
+            statement: 'bu' ili 'bs' (default: 'bu')
+
+        Returns:
+            DataFrame (prazan ako kvartal ne postoji u kocki)
+        """
+        if quarter not in self._quarter_idx:
+            return pd.DataFrame(columns=['BANKA'])
+
+        block = self.quarter_slice(quarter, statement)
+        present = ~np.isnan(block)
+        bank_mask = present.any(axis=1)
+        position_mask = present.any(axis=0)
+
+        df = pd.DataFrame(
+            block[np.ix_(bank_mask, position_mask)],
+            columns=[p for p, keep in zip(self.positions, position_mask) if keep],
+        ).fillna(0)
+        df.insert(0, 'BANKA', [get_bank_name(b) for b, keep in zip(self.banks, bank_mask) if keep])
+        df.columns.name = 'POZICIJA'
+        return df
+
+
+if __name__ == "__main__":
+    cube_path = build_cube()
+    cube = BankCube(cube_path)
+    print(f"Kocka snimljena u {cube_path}: oblik {cube.values.shape}")
+    report = pd.read_csv(cube_path / REPORT_FILE)
+    print(f"Validacija: {len(report)} ćelija ne prolazi provjeru")
+    if not report.empty:
+        print(report['PROVJERA'].value_counts().to_string())
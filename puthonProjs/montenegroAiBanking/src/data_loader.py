@@ -3,6 +3,8 @@ from pathlib import Path
 import re
 import streamlit as st
 from src.bank_names import get_bank_name
+from src.cube import BankCube, resolve_cube_dir
+from src.validation import REPORT_FILE, REPORT_COLUMNS
 
 def load_and_clean_data(data_folder: str = "data", quarter_pattern: str = "0925"):
     """
@@ -106,7 +108,7 @@ def process_user_dataframe(df):
         # Očekujemo: 'POZICIJA', 'IZNOS', 'BANKA'
         
         # 2. Čišćenje iznosa (za svaki slučaj, ako su stringovi)
-        if df['IZNOS'].dtype == 'object':
+        if not pd.api.types.is_numeric_dtype(df['IZNOS']):
             df['IZNOS'] = df['IZNOS'].apply(clean_currency_string)
             
         # 3. PIVOTIRANJE (Ključni korak!)
@@ -129,4 +131,48 @@ def process_user_dataframe(df):
 
     except Exception as e:
         st.error(f"Greška pri obradi DataFrame-a: {e}")
-        return None
\ No newline at end of file
+        return None
+
+@st.cache_resource
+def get_shared_cube(version_dir: str):
+    """
+    Otvara memorijski mapiranu kocku jednom po procesu; sve sesije dijele isti objekat.
+    Keš je vezan za folder verzije, pa nova izgradnja daje novi objekat.
+    """
+    return BankCube(version_dir)
+
+def load_quarter_from_cube(quarter_pattern: str = "0925", cube_dir: str = "data/cube"):
+    """
+    Vraća pivotiranu tabelu (redovi=banke, kolone=pozicije) direktno iz kocke,
+    u istom obliku kao process_user_dataframe. Vraća None ako kocka ne postoji.
+    
+    Args:
+        quarter_pattern: Pattern za kvartal (npr. "0925")
+        cube_dir: Folder sa kockom (default: "data/cube")
+    
+    Returns:
+        DataFrame sa kolonom 'BANKA' i kolonama pozicija ili None
+    """
+    # Provjera van keša, da se kocka izgrađena kasnije odmah koristi
+    version_dir = resolve_cube_dir(cube_dir)
+    if version_dir is None:
+        return None
+    return get_shared_cube(str(version_dir)).to_frame(quarter_pattern, statement='bu')
+
+@st.cache_data
+def _read_validation_report(report_path: str, mtime: float):
+    """Keširano čitanje izvještaja; mtime je dio ključa keša."""
+    return pd.read_csv(report_path, dtype={'KVARTAL': str})
+
+def load_validation_report(cube_dir: str = "data/cube"):
+    """
+    Učitava izvještaj validacije koji se pravi pri izgradnji kocke.
+    Vraća prazan DataFrame ako izvještaj ne postoji.
+    """
+    # Provjera van keša, kao u load_quarter_from_cube, da se izvještaj
+    # kocke izgrađene kasnije odmah prikaže
+    version_dir = resolve_cube_dir(cube_dir)
+    if version_dir is None or not (version_dir / REPORT_FILE).exists():
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    report_path = version_dir / REPORT_FILE
+    return _read_validation_report(str(report_path), report_path.stat().st_mtime)
@@ -0,0 +1,122 @@
+"""
+Formati izvještaja (bilans uspjeha i bilans stanja) kroz godine i
+mapiranje njihovih pozicija na kanonske pozicije.
+
+Centralna banka je više puta mijenjala obrasce: iste stavke imaju drugu
+oznaku ("22. NETO PROFIT/GUBITAK (20 - 21)" -> "22. NETO PROFIT/GUBITAK
+(III - 21)", "18. UKUPNA SREDSTVA" -> "16. UKUPNA SREDSTVA"), a isti tekst
+se piše na više načina. Kanonska pozicija je pozicija iz najnovijeg
+formata; starije pozicije bez odgovarajuće stavke u najnovijem formatu
+ostaju zasebne pozicije.
+"""
+
+import re
+
+# Formati po izvještaju, od najnovijeg: (naziv, početak ukupne pozicije po
+# kojoj se format prepoznaje). Prvi format za izvještaj je kanonski.
+LAYOUTS = {
+    'bu': [
+        ('bu_2018', '22. NETO PROFIT/GUBITAK (III - 21)'),
+        ('bu_2013', '22. NETO PROFIT/GUBITAK (20 - 21)'),
+        ('bu_2009', 'VIII. NETO PRIHODI / RASHODI POSLE VANREDNIH STAVKI'),
+        ('bu_2005', 'VIII. NETO PRIHODI / RASHODI POSLIJE VANREDNIH STAVKI'),
+    ],
+    'bs': [
+        ('bs_2018', '36. UKUPNI KAPITAL I OBAVEZE'),
+        ('bs_2013', '40. UKUPNI KAPITAL I OBAVEZE'),
+        ('bs_2009', '33. UKUPNA PASIVA'),
+        ('bs_2005', '28. UKUPNA PASIVA'),
+    ],
+}
+
+LAYOUT_NAMES = [name for layouts in LAYOUTS.values() for name, _ in layouts]
+
+# Oznaka pozicije na početku naziva: "PR 1.", "PR 1. 3)", "IX.", "22.", "2.a."
+_CODE_PATTERN = re.compile(r'^(?:(?:PR|RA) \d+\.(?: ?\d+\))?|[IVX]+\.|\d+\.(?:[a-z]\.)?)')
+
+# Oznaka u starijem formatu -> oznaka iste stavke u kanonskom formatu.
+# Mapiraju se samo stavke istog značenja; ostale ostaju zasebne pozicije.
+CANONICAL_CODES = {
+    'bu_2013': {
+        '1.': '1.', '2.': '3.', '3.': 'I.', '6.': '18.', '7.': '4.', '8.': '5.',
+        '9.': 'II.', '13.': '9.', '14.': '10.', '15.': '13.', '16.': '15.',
+        '17.': '14.', '18.': '19.', '19.': '12.', '20.': 'III.', '21.': '21.',
+        '22.': '22.',
+    },
+    'bu_2009': {
+        'PR 1.': '1.', 'RA 1.': '3.', 'I.': 'I.', 'PR 2.': '4.', 'RA 2.': '5.',
+        'IV.': 'II.', 'RA 3. 1)': '13.', 'VIII.': 'III.', 'RA 5.': '21.', 'IX.': '22.',
+    },
+    'bu_2005': {
+        'PR 1.': '1.', 'RA 1.': '3.', 'I.': 'I.', 'PR 2.': '4.', 'RA 2.': '5.',
+        'IV.': 'II.', 'RA 3. 1)': '13.', 'VIII.': 'III.', 'RA 5.': '21.', 'IX.': '22.',
+    },
+    'bs_2013': {
+        '1.': '1.', '2.': '2.a.', '3.': '2.b.', '4.': '14.', '5.': '4.', '6.': '5.',
+        '7.': '6.', '11.': '9.', '12.': '10.', '13.': '11.', '14.': '12.', '15.': '13.',
+        '18.': '16.', '19.': '17.a.', '20.': '17.b.', '21.': '17.c.', '22.': '17.d.',
+        '23.': '18.', '24.': '19.', '25.': '20.', '26.': '17.e.', '27.': '22.',
+        '28.': '24.', '29.': '25.', '30.': '26.', '31.': '27.', '32.': '28.',
+        '33.': '29.', '34.': '30.', '35.': '31.', '36.': '32.', '37.': '33.',
+        '38.': '34.', '39.': '35.', '40.': '36.',
+    },
+    'bs_2009': {
+        '1.': '1.', '13.': '16.', '22.': '26.', '24.': '27.', '25.': '28.',
+        '26.': '34.', '29.': '30.', '32.': '35.', '33.': '36.',
+    },
+    'bs_2005': {
+        '1.': '1.', '11.': '16.', '17.': '26.', '19.': '27.', '20.': '28.',
+        '21.': '34.', '24.': '30.', '27.': '35.', '28.': '36.',
+    },
+}
+
+
+def position_code(label: str):
+    """
+    Vraća oznaku pozicije sa početka naziva ("22. NETO PROFIT..." -> "22.").
+
+    Args:
+        label: Naziv pozicije iz CSV fajla
+
+    Returns:
+        Oznaka ili None ako naziv ne počinje oznakom
+    """
+    match = _CODE_PATTERN.match(label)
+    return match.group(0) if match else None
+
+
+def detect_layout(statement: str, labels):
+    """
+    Prepoznaje format izvještaja po ukupnoj poziciji koja postoji samo u njemu.
+
+    Args:
+        statement: 'bu' ili 'bs'
+        labels: Nazivi pozicija iz jednog fajla
+
+    Returns:
+        Naziv formata (npr. 'bu_2018') ili None ako format nije prepoznat
+    """
+    for name, marker in LAYOUTS[statement]:
+        if any(label.startswith(marker) for label in labels):
+            return name
+    return None
+
+
+def canonical_key(layout: str, code: str):
+    """
+    Vraća (format, oznaka) kanonske pozicije za oznaku iz datog formata.
+
+    Stavke mapirane u CANONICAL_CODES prelaze u kanonski format izvještaja,
+    a ostale ostaju u svom formatu.
+
+    Args:
+        layout: Naziv formata (npr. 'bs_2013')
+        code: Oznaka pozicije u tom formatu (npr. '18.')
+
+    Returns:
+        Tuple (format, oznaka), npr. ('bs_2018', '16.')
+    """
+    mapped = CANONICAL_CODES.get(layout, {}).get(code)
+    if mapped is None:
+        return layout, code
+    return LAYOUTS[layout[:2]][0][0], mapped
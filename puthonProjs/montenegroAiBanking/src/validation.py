@@ -0,0 +1,261 @@
+"""
+Validacija podataka nad cijelom kockom (sve banke × svi kvartali odjednom).
+
+Provjerava računovodstvene identitete (zbir komponenti = ukupna pozicija,
+AKTIVA = PASIVA), banke koje nedostaju u nekom kvartalu, kvartale koji
+nedostaju i fajlove nepoznatog formata. U izvještaj ulaze samo ćelije
+koje ne prolaze provjeru. Fajl koji nije mogao biti pročitan prijavljuje se
+jednom (sa imenom fajla), bez dodatnih prijava za njegovu banku i kvartal.
+
+Pokretanje nad već izgrađenom kockom:
+    python -m src.validation
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from src.bank_names import get_bank_name
+
+REPORT_FILE = 'validation.csv'
+REPORT_COLUMNS = ['IZVJESTAJ', 'KOD', 'BANKA', 'KVARTAL', 'PROVJERA', 'OCEKIVANO', 'IZNOS', 'RAZLIKA', 'FAJL']
+
+
+def _terms(plus=(), minus=()):
+    """Pravi listu (znak, oznaka_pozicije) za komponente identiteta."""
+    return [(1, p) for p in plus] + [(-1, p) for p in minus]
+
+
+def _codes(first: int, last: int):
+    """Oznake numerisanih pozicija, npr. _codes(1, 3) -> ['1.', '2.', '3.']."""
+    return [f'{n}.' for n in range(first, last + 1)]
+
+
+# Identiteti: (format, naziv, oznaka ukupne pozicije, komponente).
+# Oznake su iz datog formata (src.layouts) i identitet se provjerava samo
+# za ćelije (banka × kvartal) čiji je izvještaj u tom formatu.
+IDENTITIES = [
+    # --- Bilans uspjeha, format od 2018 ---
+    ('bu_2018', 'I = 1 + 2 - 3', 'I.', _terms(plus=['1.', '2.'], minus=['3.'])),
+    ('bu_2018', 'II = 4 - 5', 'II.', _terms(plus=['4.'], minus=['5.'])),
+    ('bu_2018', 'III = I + II + 6..12 - 13..19', 'III.',
+     _terms(plus=['I.', 'II.'] + _codes(6, 12), minus=_codes(13, 19))),
+    ('bu_2018', '22 = III - 21', '22.', _terms(plus=['III.'], minus=['21.'])),
+    # --- Bilans uspjeha, format 2013-2017 ---
+    ('bu_2013', '3 = 1 - 2', '3.', _terms(plus=['1.'], minus=['2.'])),
+    ('bu_2013', '9 = 7 - 8', '9.', _terms(plus=['7.'], minus=['8.'])),
+    ('bu_2013', '20 = 3 + 4 - 5 - 6 + 9..14 - 15..18 + 19', '20.',
+     _terms(plus=['3.', '4.'] + _codes(9, 14) + ['19.'], minus=['5.', '6.'] + _codes(15, 18))),
+    ('bu_2013', '22 = 20 - 21', '22.', _terms(plus=['20.'], minus=['21.'])),
+]
+# --- Bilans uspjeha, formati do 2009 (iste oznake u oba formata) ---
+for _layout in ('bu_2009', 'bu_2005'):
+    IDENTITIES += [
+        (_layout, 'I = PR1 - RA1', 'I.', _terms(plus=['PR 1.'], minus=['RA 1.'])),
+        (_layout, 'III = I - II', 'III.', _terms(plus=['I.'], minus=['II.'])),
+        (_layout, 'IV = PR2 - RA2', 'IV.', _terms(plus=['PR 2.'], minus=['RA 2.'])),
+        (_layout, 'V = III + IV', 'V.', _terms(plus=['III.', 'IV.'])),
+        (_layout, 'VI = V + PR3 - RA3', 'VI.', _terms(plus=['V.', 'PR 3.'], minus=['RA 3.'])),
+        (_layout, 'VII = PR4 - RA4', 'VII.', _terms(plus=['PR 4.'], minus=['RA 4.'])),
+        (_layout, 'VIII = VI + VII', 'VIII.', _terms(plus=['VI.', 'VII.'])),
+        (_layout, 'IX = VIII - RA5', 'IX.', _terms(plus=['VIII.'], minus=['RA 5.'])),
+    ]
+IDENTITIES += [
+    # --- Bilans stanja, format od 2018 ---
+    ('bs_2018', 'AKTIVA = 1..15', '16.', _terms(plus=_codes(1, 15))),
+    ('bs_2018', 'OBAVEZE = 17..27', '28.', _terms(plus=_codes(17, 27))),
+    ('bs_2018', 'KAPITAL = 29..34', '35.', _terms(plus=_codes(29, 34))),
+    ('bs_2018', 'PASIVA = 28 + 35', '36.', _terms(plus=['28.', '35.'])),
+    ('bs_2018', 'AKTIVA = PASIVA', '16.', _terms(plus=['36.'])),
+    # --- Bilans stanja, format 2013-2017 ---
+    ('bs_2013', 'AKTIVA = 1..17', '18.', _terms(plus=_codes(1, 17))),
+    ('bs_2013', 'OBAVEZE = 19..31', '32.', _terms(plus=_codes(19, 31))),
+    ('bs_2013', 'KAPITAL = 33..38', '39.', _terms(plus=_codes(33, 38))),
+    ('bs_2013', 'PASIVA = 32 + 39', '40.', _terms(plus=['32.', '39.'])),
+    ('bs_2013', 'AKTIVA = PASIVA', '18.', _terms(plus=['40.'])),
+    # --- Bilans stanja, format 2009 ---
+    ('bs_2009', 'AKTIVA = 1..3 + 4.b + 5..11 - 12', '13.',
+     _terms(plus=_codes(1, 3) + ['4.b.'] + _codes(5, 11), minus=['12.'])),
+    ('bs_2009', 'PASIVA = 25 + 26 + 32', '33.', _terms(plus=['25.', '26.', '32.'])),
+    ('bs_2009', 'AKTIVA = PASIVA', '13.', _terms(plus=['33.'])),
+    # --- Bilans stanja, format do 2008 ---
+    ('bs_2005', 'AKTIVA = 1..3 + 4.b + 5..9 - 10', '11.',
+     _terms(plus=_codes(1, 3) + ['4.b.'] + _codes(5, 9), minus=['10.'])),
+    ('bs_2005', 'OBAVEZE = 12..19', '20.', _terms(plus=_codes(12, 19))),
+    ('bs_2005', 'KAPITAL = 22..26', '27.', _terms(plus=_codes(22, 26))),
+    ('bs_2005', 'PASIVA = 20 + 21 + 27', '28.', _terms(plus=['20.', '21.', '27.'])),
+    ('bs_2005', 'AKTIVA = PASIVA', '11.', _terms(plus=['28.'])),
+]
+
+
+def _quarter_number(quarter: str) -> int:
+    """Redni broj kvartala (MMYY), tako da su uzastopni kvartali uzastopni brojevi."""
+    return int(quarter[2:]) * 4 + int(quarter[:2]) // 3 - 1
+
+
+def _quarter_label(number: int) -> str:
+    """Obrnuto od _quarter_number: redni broj -> MMYY."""
+    return f"{(number % 4 + 1) * 3:02d}{number // 4:02d}"
+
+
+def _rows(cube, statement, codes, quarter_idx, check, expected=np.nan, actual=np.nan):
+    """Pravi redove izvještaja za niz ćelija (kod, kvartal) koje nisu prošle provjeru."""
+    return pd.DataFrame({
+        'IZVJESTAJ': statement,
+        'KOD': codes,
+        'BANKA': [get_bank_name(code) for code in codes],
+        'KVARTAL': [cube.quarters[q] for q in quarter_idx],
+        'PROVJERA': check,
+        'OCEKIVANO': expected,
+        'IZNOS': actual,
+        'RAZLIKA': np.asarray(actual) - np.asarray(expected),
+    }, columns=REPORT_COLUMNS)
+
+
+def validate_cube(cube) -> pd.DataFrame:
+    """
+    Provjerava cijelu kocku i vraća samo ćelije koje ne prolaze provjeru.
+
+    Svaki identitet se računa jednom nad matricom (banka × kvartal), bez
+    petlje po fajlovima. Dozvoljeno odstupanje je 0.5 po sabirku (iznosi su
+    zaokruženi na hiljade).
+
+    Args:
+        cube: BankCube (iz src.cube)
+
+    Returns:
+        DataFrame sa kolonama REPORT_COLUMNS (prazan ako je sve u redu)
+    """
+    reports = []
+    stmt_idx = {s: i for i, s in enumerate(cube.statements)}
+    layout_idx = {name: i for i, name in enumerate(cube.layouts)}
+    block_cache = {}
+
+    def block(layout, code):
+        """Iznos pozicije iz datog formata (banka × kvartal); NaN ako pozicija ne postoji."""
+        key = (layout, code)
+        if key not in block_cache:
+            col = cube.position_map.get(layout, {}).get(code)
+            if col is None:
+                block_cache[key] = np.full(cube.values.shape[1:3], np.nan)
+            else:
+                block_cache[key] = cube.values[stmt_idx[layout[:2]], :, :, col]
+        return block_cache[key]
+
+    # 1. Računovodstveni identiteti
+    for layout, name, total_code, components in IDENTITIES:
+        statement = layout[:2]
+        if layout not in layout_idx:
+            continue
+        total = block(layout, total_code)
+        applies = (cube.cell_layouts[stmt_idx[statement]] == layout_idx[layout]) & ~np.isnan(total)
+        if not applies.any():
+            continue
+
+        expected = np.zeros_like(total)
+        for sign, code in components:
+            expected += sign * np.nan_to_num(block(layout, code))
+
+        tolerance = 0.5 * (len(components) + 1)
+        failed = applies & (np.abs(total - expected) > tolerance)
+        bank_idx, quarter_idx = np.nonzero(failed)
+        if bank_idx.size:
+            reports.append(_rows(cube, statement, [cube.banks[b] for b in bank_idx], quarter_idx, name,
+                                 expected[failed], total[failed]))
+
+    # 2. Prisustvo podataka po izvještaju (banka × kvartal)
+    present = ~np.isnan(cube.values).all(axis=3)
+
+    # Nečitljivi fajlovi se prijavljuju jednom, a njihove ćelije se ne
+    # prijavljuju ponovo kao izvještaj, banka ili kvartal koji nedostaje
+    bank_pos = {b: i for i, b in enumerate(cube.banks)}
+    quarter_pos = {q: i for i, q in enumerate(cube.quarters)}
+    unreadable_cells = np.zeros_like(present)
+    for entry in cube.unreadable:
+        if entry['KOD'] in bank_pos and entry['KVARTAL'] in quarter_pos:
+            unreadable_cells[stmt_idx[entry['IZVJESTAJ']], bank_pos[entry['KOD']], quarter_pos[entry['KVARTAL']]] = True
+    if cube.unreadable:
+        unreadable = pd.DataFrame(cube.unreadable)
+        reports.append(pd.DataFrame({
+            'IZVJESTAJ': unreadable['IZVJESTAJ'],
+            'KOD': unreadable['KOD'],
+            'BANKA': [get_bank_name(code) for code in unreadable['KOD']],
+            'KVARTAL': unreadable['KVARTAL'],
+            'PROVJERA': 'necitljiv fajl',
+            'FAJL': unreadable['FAJL'],
+        }, columns=REPORT_COLUMNS))
+
+    # Fajlovi čiji format izvještaja nije prepoznat (src.layouts)
+    for s, statement in enumerate(cube.statements):
+        bank_idx, quarter_idx = np.nonzero(present[s] & (cube.cell_layouts[s] < 0))
+        if bank_idx.size:
+            reports.append(_rows(cube, statement, [cube.banks[b] for b in bank_idx], quarter_idx, 'nepoznat format'))
+
+    # Banka ima jedan izvještaj za kvartal, a drugi nedostaje
+    any_statement = present.any(axis=0)
+    for s, statement in enumerate(cube.statements):
+        bank_idx, quarter_idx = np.nonzero(any_statement & ~present[s] & ~unreadable_cells[s])
+        if bank_idx.size:
+            reports.append(_rows(cube, statement, [cube.banks[b] for b in bank_idx], quarter_idx, 'nedostaje izvjestaj'))
+
+    # Institucija nedostaje u kvartalu između svog prvog i posljednjeg kvartala.
+    # Provjera ide po instituciji (folderu), ne po kodu, jer se kod mijenja
+    # kad banka promijeni ime (pdg -> sgm -> pdg).
+    institutions = sorted(set(cube.institutions))
+    membership = np.array([[inst == own for own in cube.institutions] for inst in institutions])
+    inst_present = (membership.astype(int) @ any_statement.astype(int)) > 0
+    seen_before = np.maximum.accumulate(inst_present, axis=1)
+    seen_after = np.maximum.accumulate(inst_present[:, ::-1], axis=1)[:, ::-1]
+    inst_missing = seen_before & seen_after & ~inst_present
+    inst_pos = {inst: i for i, inst in enumerate(institutions)}
+    for entry in cube.unreadable:
+        if entry['INSTITUCIJA'] in inst_pos and entry['KVARTAL'] in quarter_pos:
+            inst_missing[inst_pos[entry['INSTITUCIJA']], quarter_pos[entry['KVARTAL']]] = False
+    inst_idx, quarter_idx = np.nonzero(inst_missing)
+    if inst_idx.size:
+        reports.append(_rows(cube, '', [institutions[i] for i in inst_idx], quarter_idx, 'nedostaje banka'))
+
+    # Kvartali koji uopšte ne postoje u podacima
+    numbers = np.array([_quarter_number(q) for q in cube.quarters])
+    if numbers.size:
+        unreadable_numbers = {_quarter_number(entry['KVARTAL']) for entry in cube.unreadable}
+        missing = sorted(set(range(numbers.min(), numbers.max() + 1)) - set(numbers.tolist()) - unreadable_numbers)
+        if missing:
+            reports.append(pd.DataFrame({
+                'IZVJESTAJ': '',
+                'KOD': '',
+                'BANKA': '',
+                'KVARTAL': [_quarter_label(n) for n in missing],
+                'PROVJERA': 'nedostaje kvartal',
+            }, columns=REPORT_COLUMNS))
+
+    if not reports:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    return pd.concat(reports, ignore_index=True)
+
+
+def write_report(report: pd.DataFrame, cube_dir: str = "data/cube") -> Path:
+    """
+    Snima izvještaj validacije kao CSV pored kocke.
+
+    Args:
+        report: Rezultat validate_cube
+        cube_dir: Folder sa kockom (default: "data/cube")
+
+    Returns:
+        Putanja do snimljenog izvještaja
+    """
+    path = Path(cube_dir) / REPORT_FILE
+    report.to_csv(path, index=False, encoding='utf-8')
+    return path
+
+
+if __name__ == "__main__":
+    from src.cube import BankCube
+
+    cube = BankCube()
+    report = validate_cube(cube)
+    report_path = write_report(report, cube.path)
+    print(f"Izvještaj snimljen u {report_path}: {len(report)} ćelija ne prolazi provjeru")
+    if not report.empty:
+        print(report['PROVJERA'].value_counts().to_string())
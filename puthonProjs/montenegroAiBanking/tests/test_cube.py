@@ -0,0 +1,61 @@
+import json
+
+import pandas as pd
+import pytest
+
+from src.calculations import MAPPING, calculate_kpis
+from src.cube import CURRENT_FILE, BankCube, build_cube
+from src.data_loader import load_and_clean_data, process_user_dataframe
+
+KPI_COLUMNS = ['Neto_Kamate', 'Neto_Naknade', 'Operativni_Prihodi', 'Operativni_Troskovi', 'CIR', 'Neto_Dobit_Final']
+
+
+def _write_bu(data, bank_code, quarter, amounts):
+    """Upisuje bilans uspjeha (format od 2018) sa iznosima kao u izvozu: "1,234"."""
+    lines = ['POZICIJA,IZNOS'] + [f'{label},"{amount:,}"' for label, amount in amounts.items()]
+    path = data / 'bu' / bank_code / f"{quarter}{bank_code}_bu.csv"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+def _kpis(df):
+    return calculate_kpis(df).sort_values('BANKA').set_index('BANKA')[KPI_COLUMNS]
+
+
+def test_to_frame_matches_csv_kpis(tmp_path, monkeypatch):
+    data = tmp_path / 'data'
+    for n, bank_code in enumerate(['ckb', 'hip'], start=1):
+        amounts = {label: 1000 * n + 37 * i for i, label in enumerate(MAPPING.values())}
+        _write_bu(data, bank_code, '0925', amounts)
+    cube = BankCube(build_cube(str(data), str(tmp_path / 'cube')))
+
+    # CSV put traži fajlove relativno od radnog foldera
+    monkeypatch.chdir(tmp_path)
+    from_csv = process_user_dataframe(load_and_clean_data(quarter_pattern='0925'))
+
+    pd.testing.assert_frame_equal(_kpis(cube.to_frame('0925')), _kpis(from_csv), check_names=False)
+
+
+def test_rebuild_moves_current_and_keeps_previous(tmp_path):
+    data = tmp_path / 'data'
+    cube_dir = tmp_path / 'cube'
+    _write_bu(data, 'ckb', '0925', {MAPPING['neto_dobit']: 1234})
+
+    versions = [build_cube(str(data), str(cube_dir)) for _ in range(3)]
+
+    assert (cube_dir / CURRENT_FILE).read_text(encoding='utf-8') == versions[-1].name
+    assert BankCube(str(cube_dir)).path == versions[-1]
+    assert sorted(p for p in cube_dir.glob('v*') if p.is_dir()) == sorted(versions[1:])
+
+
+def test_axis_length_mismatch_raises(tmp_path):
+    data = tmp_path / 'data'
+    for bank_code in ['ckb', 'hip']:
+        _write_bu(data, bank_code, '0925', {MAPPING['neto_dobit']: 1234})
+    version_dir = build_cube(str(data), str(tmp_path / 'cube'))
+
+    banks_file = version_dir / 'banks.json'
+    banks_file.write_text(json.dumps(json.loads(banks_file.read_text(encoding='utf-8'))[:-1]), encoding='utf-8')
+
+    with pytest.raises(ValueError, match='banks'):
+        BankCube(str(version_dir))
@@ -0,0 +1,121 @@
+from src.cube import BankCube, build_cube
+from src.validation import validate_cube
+
+BU = "POZICIJA,IZNOS\n22. NETO PROFIT/GUBITAK (III - 21),0\n"
+BS = "Aktiva,IZNOS\n16. UKUPNA SREDSTVA:,0\n36. UKUPNI KAPITAL I OBAVEZE: (28. + 35.),0\n"
+
+
+def _write(data, folder, file_prefix, bu=BU, bs=BS):
+    """Upisuje par bu/bs fajlova, npr. _write(data, 'pdg', '0320sgm')."""
+    for statement, content in (('bu', bu), ('bs', bs)):
+        path = data / statement / folder / f"{file_prefix}_{statement}.csv"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+
+
+def _report(tmp_path):
+    data = tmp_path / 'data'
+    return validate_cube(BankCube(build_cube(str(data), str(tmp_path / 'cube'))))
+
+
+def _missing_banks(tmp_path, files):
+    for folder, file_prefix in files:
+        _write(tmp_path / 'data', folder, file_prefix)
+    report = _report(tmp_path)
+    missing = report[report['PROVJERA'] == 'nedostaje banka']
+    return sorted(zip(missing['KOD'], missing['KVARTAL']))
+
+
+def _bu(profit_before_tax, tax, net_profit):
+    """Bilans uspjeha (format od 2018) gdje dobit prije poreza dolazi samo od kamata."""
+    return (
+        "POZICIJA,IZNOS\n"
+        f"1. Prihodi od kamata i slicni prihodi,{profit_before_tax}\n"
+        f"I. NETO PRIHODI OD KAMATA (1 + 2 - 3),{profit_before_tax}\n"
+        f"III. DOBITAK/GUBITAK PRE OPOREZIVANJA : I+II+6+7+8+9+10+11+12-13-14-15-16-17-18-19,{profit_before_tax}\n"
+        f"21. Porez na dobit,{tax}\n"
+        f'22. NETO PROFIT/GUBITAK (III - 21),"{net_profit:,}"\n'
+    )
+
+
+def _bs(assets, liabilities, equity):
+    """Bilans stanja (format od 2018) gdje je svaka ukupna pozicija zbir jedne stavke."""
+    return (
+        "Aktiva,IZNOS\n"
+        f"1. Novcana sredstva i racuni depozita kod centralnih banaka,{assets}\n"
+        f"16. UKUPNA SREDSTVA:,{assets}\n"
+        f"17. Finansijske obaveze koje se iskazuju po amortizovanoj vrijednosti,{liabilities}\n"
+        f"28. UKUPNE OBAVEZE:,{liabilities}\n"
+        f"29. Akcijski kapital,{equity}\n"
+        f"35. UKUPAN KAPITAL: (29. do 34.),{equity}\n"
+        f"36. UKUPNI KAPITAL I OBAVEZE: (28. + 35.),{liabilities + equity}\n"
+    )
+
+
+def test_renamed_bank_is_not_missing(tmp_path):
+    # Ista institucija (folder pdg) pod kodovima pdg -> sgm -> pdg
+    files = [('ckb', q + 'ckb') for q in ('0320', '0620', '0920')]
+    files += [('pdg', '0320pdg'), ('pdg', '0620sgm'), ('pdg', '0920pdg')]
+    assert _missing_banks(tmp_path, files) == []
+
+
+def test_gap_across_rename_is_flagged(tmp_path):
+    files = [('ckb', q + 'ckb') for q in ('0320', '0620', '0920')]
+    files += [('pdg', '0320pdg'), ('pdg', '0920sgm')]
+    assert _missing_banks(tmp_path, files) == [('pdg', '0620')]
+
+
+def test_wrong_net_profit_is_reported(tmp_path):
+    _write(tmp_path / 'data', 'ckb', '0924ckb', bu=_bu(1200, 200, 1500))
+    report = _report(tmp_path)
+    failed = report[report['PROVJERA'] == '22 = III - 21']
+    assert failed[['IZVJESTAJ', 'KOD', 'KVARTAL', 'OCEKIVANO', 'IZNOS', 'RAZLIKA']].values.tolist() == [
+        ['bu', 'ckb', '0924', 1000.0, 1500.0, 500.0]
+    ]
+    assert set(report['PROVJERA']) == {'22 = III - 21'}
+
+
+def test_assets_not_equal_to_liabilities_is_reported(tmp_path):
+    _write(tmp_path / 'data', 'hip', '0624hip', bs=_bs(1000, 600, 300))
+    report = _report(tmp_path)
+    assert report[['IZVJESTAJ', 'KOD', 'PROVJERA', 'OCEKIVANO', 'IZNOS', 'RAZLIKA']].values.tolist() == [
+        ['bs', 'hip', 'AKTIVA = PASIVA', 900.0, 1000.0, 100.0]
+    ]
+
+
+def test_rounding_within_tolerance_is_not_reported(tmp_path):
+    # 22 = III - 21 ima dvije komponente: dozvoljeno 0.5 * 3 = 1.5
+    _write(tmp_path / 'data', 'ckb', '0924ckb', bu=_bu(1200, 200, 1001), bs=_bs(1000, 600, 399))
+    assert _report(tmp_path).empty
+
+
+def test_missing_quarter_is_reported(tmp_path):
+    for quarter in ('0320', '1220'):
+        _write(tmp_path / 'data', 'ckb', quarter + 'ckb')
+    report = _report(tmp_path)
+    assert report['PROVJERA'].tolist() == ['nedostaje kvartal', 'nedostaje kvartal']
+    assert report['KVARTAL'].tolist() == ['0620', '0920']
+
+
+def test_unreadable_file_is_reported_once(tmp_path):
+    # Oštećen PDF izvoz: svaki znak je snimljen kao "(cid:N)"
+    garbled = "(cid:51)(cid:50),(cid:44)(cid:61)\n(cid:21)(cid:21),(cid:20)(cid:19)\n"
+    for quarter in ('0320', '0920'):
+        _write(tmp_path / 'data', 'ckb', quarter + 'ckb')
+    _write(tmp_path / 'data', 'ckb', '0620ckb', bu=garbled, bs=garbled)
+    report = _report(tmp_path)
+    assert report[['IZVJESTAJ', 'KOD', 'KVARTAL', 'PROVJERA', 'FAJL']].values.tolist() == [
+        ['bu', 'ckb', '0620', 'necitljiv fajl', '0620ckb_bu.csv'],
+        ['bs', 'ckb', '0620', 'necitljiv fajl', '0620ckb_bs.csv'],
+    ]
+
+
+def test_unreadable_file_does_not_count_as_missing_report(tmp_path):
+    garbled = "(cid:51)(cid:50),(cid:44)(cid:61)\n"
+    for quarter in ('0320', '0620', '0920'):
+        _write(tmp_path / 'data', 'hip', quarter + 'hip')
+        _write(tmp_path / 'data', 'ckb', quarter + 'ckb', bu=garbled if quarter == '0620' else BU)
+    report = _report(tmp_path)
+    assert report[['KOD', 'KVARTAL', 'PROVJERA', 'FAJL']].values.tolist() == [
+        ['ckb', '0620', 'necitljiv fajl', '0620ckb_bu.csv'],
+    ]